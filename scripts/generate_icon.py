@@ -100,29 +100,30 @@ def main():
     print(f"Generating icon in: {output_dir}")
     print()
 
-    # Generate icons at multiple sizes for ICO file
+    # Render once at full size; smaller ICO sizes are downsampled from it
     sizes = [16, 32, 48, 256]
-    images = []
+    icon = create_icon(sizes[-1])
+    images = [icon.resize((size, size), Image.LANCZOS) for size in sizes[:-1]] + [icon]
 
     for size in sizes:
-        img = create_icon(size)
-        images.append(img)
         print(f"Generated {size}x{size} icon")
 
-    # Save as ICO file (multi-resolution)
+    # Save as ICO file (multi-resolution). Pillow only writes sizes up to the
+    # base image, so save from the largest and append the rest
     ico_path = output_dir / "clarity.ico"
-    images[0].save(
+    images[-1].save(
         str(ico_path),
         format='ICO',
         sizes=[(s, s) for s in sizes],
-        append_images=images[1:]
+        append_images=images[:-1],
+        bitmap_format='png'  # PNG-compressed frames rather than raw BMP
     )
     print()
     print(f"Created: {ico_path}")
 
     # Also save a PNG version for other uses
     png_path = output_dir / "clarity_256.png"
-    images[-1].save(str(png_path), format='PNG')
+    images[-1].save(str(png_path), format='PNG', optimize=True)
     print(f"Created: {png_path}")
 
     print()
@@ -4,182 +4,368 @@ Generate audio feedback sounds for Clarity Layer.
 
 Creates simple synthesized WAV files for UI feedback sounds.
 Run this script to populate the assets/sounds/ directory.
+Requires: pip install numpy
+Optional: pip install numba (faster single-pass synthesis)
+Pass --warm to only compile and cache the Numba kernel.
 """
 
+import sys
 import wave
-import struct
-import math
 import os
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: NumPy library required. Install with: pip install numpy")
+    exit(1)
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 SAMPLE_RATE = 44100
 AMPLITUDE = 0.5  # 0.0 - 1.0
 
+# One period of a sine wave; power-of-two size so indices wrap with a mask
+_LUT_SIZE = 1024
+_SINE_LUT = np.sin(2 * np.pi * np.arange(_LUT_SIZE) / _LUT_SIZE).astype(np.float32)
+
+
+def _lut_sin(cycles, out=None):
+    """Look up sin(2*pi*cycles) in the sine table (roughly -60 dB noise floor)."""
+    index = (cycles * _LUT_SIZE).astype(np.int64)
+    index &= _LUT_SIZE - 1
+    return np.take(_SINE_LUT, index, out=out)
+
 
-def generate_sine_wave(frequency, duration, amplitude=AMPLITUDE):
-    """Generate a sine wave."""
+def generate_sine_wave(frequency, duration, amplitude=AMPLITUDE, out=None):
+    """Generate a sine wave; writes into out if given."""
     num_samples = int(SAMPLE_RATE * duration)
-    samples = []
-    for i in range(num_samples):
-        t = i / SAMPLE_RATE
-        sample = amplitude * math.sin(2 * math.pi * frequency * t)
-        samples.append(sample)
+    cycles = np.arange(num_samples, dtype=np.float32) * (frequency / SAMPLE_RATE)
+    samples = _lut_sin(cycles, out=out)
+    samples *= amplitude
     return samples
 
 
-def generate_frequency_sweep(start_freq, end_freq, duration, amplitude=AMPLITUDE):
-    """Generate a frequency sweep (rising or falling tone)."""
+def generate_frequency_sweep(start_freq, end_freq, duration, amplitude=AMPLITUDE, out=None):
+    """Generate a frequency sweep (rising or falling tone); writes into out if given."""
     num_samples = int(SAMPLE_RATE * duration)
-    samples = []
-    for i in range(num_samples):
-        t = i / num_samples
-        # Linear interpolation between frequencies
-        frequency = start_freq + (end_freq - start_freq) * t
-        sample_t = i / SAMPLE_RATE
-        sample = amplitude * math.sin(2 * math.pi * frequency * sample_t)
-        samples.append(sample)
+    t = np.linspace(0, duration, num_samples, endpoint=False, dtype=np.float32)
+    # Frequency rises linearly, so phase is its integral (quadratic in t)
+    cycles = start_freq * t + 0.5 * (end_freq - start_freq) * t * t / duration
+    samples = _lut_sin(cycles, out=out)
+    samples *= amplitude
     return samples
 
 
-def generate_chord(frequencies, duration, amplitude=AMPLITUDE):
-    """Generate a chord (multiple frequencies mixed)."""
+def generate_chord(frequencies, duration, amplitude=AMPLITUDE, out=None):
+    """Generate a chord (multiple frequencies mixed); writes into out if given."""
     num_samples = int(SAMPLE_RATE * duration)
-    samples = [0.0] * num_samples
     amp_per_freq = amplitude / len(frequencies)
+    t = np.arange(num_samples, dtype=np.float32) / SAMPLE_RATE
+    freqs = np.asarray(frequencies, dtype=np.float32)[:, None]
+    samples = np.sum(_lut_sin(freqs * t), axis=0, out=out)
+    samples *= amp_per_freq
+    return samples
 
-    for freq in frequencies:
-        for i in range(num_samples):
-            t = i / SAMPLE_RATE
-            samples[i] += amp_per_freq * math.sin(2 * math.pi * freq * t)
 
-    return samples
+def _adsr_samples(attack, decay, release):
+    """Convert attack, decay and release times to sample counts."""
+    return int(attack * SAMPLE_RATE), int(decay * SAMPLE_RATE), int(release * SAMPLE_RATE)
 
 
-def apply_envelope(samples, attack=0.01, decay=0.05, sustain=0.8, release=0.1):
-    """Apply ADSR envelope to samples."""
-    num_samples = len(samples)
-    attack_samples = int(attack * SAMPLE_RATE)
-    decay_samples = int(decay * SAMPLE_RATE)
-    release_samples = int(release * SAMPLE_RATE)
+@lru_cache(maxsize=32)
+def _envelope(num_samples, attack, decay, sustain, release):
+    """Build a read-only ADSR envelope; sounds sharing parameters reuse it."""
+    out = np.empty(num_samples, dtype=np.float32)
+    attack_samples, decay_samples, release_samples = _adsr_samples(attack, decay, release)
     sustain_samples = num_samples - attack_samples - decay_samples - release_samples
 
     if sustain_samples < 0:
-        # Short sound, just apply linear fade
-        for i in range(num_samples):
-            t = i / num_samples
-            if t < 0.1:
-                samples[i] *= t / 0.1
-            elif t > 0.9:
-                samples[i] *= (1 - t) / 0.1
-        return samples
-
-    for i in range(num_samples):
-        if i < attack_samples:
-            # Attack: ramp up
-            envelope = i / attack_samples
-        elif i < attack_samples + decay_samples:
-            # Decay: ramp down to sustain level
-            decay_progress = (i - attack_samples) / decay_samples
-            envelope = 1.0 - (1.0 - sustain) * decay_progress
-        elif i < attack_samples + decay_samples + sustain_samples:
-            # Sustain
-            envelope = sustain
-        else:
-            # Release: ramp down to 0
-            release_progress = (i - attack_samples - decay_samples - sustain_samples) / release_samples
-            envelope = sustain * (1 - release_progress)
+        # Short sound, just apply linear fade over the first and last 10%
+        t = np.arange(num_samples, dtype=np.float32) / num_samples
+        np.minimum(1.0, np.minimum(t, 1 - t) / 0.1, out=out)
+        out.flags.writeable = False
+        return out
+
+    decay_end = attack_samples + decay_samples
+    sustain_end = decay_end + sustain_samples
+    # Attack: ramp up
+    out[:attack_samples] = np.linspace(0.0, 1.0, attack_samples, endpoint=False, dtype=np.float32)
+    # Decay: ramp down to sustain level
+    out[attack_samples:decay_end] = np.linspace(1.0, sustain, decay_samples, endpoint=False, dtype=np.float32)
+    # Sustain
+    out[decay_end:sustain_end] = sustain
+    # Release: ramp down to 0
+    out[sustain_end:] = np.linspace(sustain, 0.0, release_samples, endpoint=False, dtype=np.float32)
+    out.flags.writeable = False
+    return out
 
-        samples[i] *= envelope
 
+def apply_envelope(samples, attack=0.01, decay=0.05, sustain=0.8, release=0.1):
+    """Apply ADSR envelope to samples."""
+    samples *= _envelope(len(samples), attack, decay, sustain, release)
     return samples
 
 
+def _synth(freq0, freq1, duration, amp, attack_samples, decay_samples, sustain, release_samples, out):
+    """Render an enveloped tone or sweep straight into a 16-bit buffer in one pass.
+
+    Same float32 maths, step for step, as generate_sine_wave or
+    generate_frequency_sweep + apply_envelope + _finish, fused into a single
+    loop for Numba to compile; both paths produce identical samples.
+    """
+    f32 = np.float32
+    n = len(out)
+    if n == 0:
+        return out
+
+    sustain_samples = n - attack_samples - decay_samples - release_samples
+    decay_end = attack_samples + decay_samples
+    sustain_end = decay_end + sustain_samples
+    step = duration / n
+    sweep = f32(0.5 * (freq1 - freq0))
+
+    for i in range(n):
+        if freq0 == freq1:
+            cycles = f32(i) * f32(freq0 / SAMPLE_RATE)
+        else:
+            t = f32(i * step)
+            cycles = f32(freq0) * t + sweep * t * t / f32(duration)
+        sample = _SINE_LUT[int(cycles * f32(_LUT_SIZE)) & (_LUT_SIZE - 1)] * f32(amp)
+
+        if sustain_samples < 0:
+            t = f32(i) / f32(n)
+            envelope = min(f32(1.0), min(t, f32(1.0) - t) / f32(0.1))
+        elif i < attack_samples:
+            envelope = f32(i * (1.0 / attack_samples))
+        elif i < decay_end:
+            envelope = f32((i - attack_samples) * ((sustain - 1.0) / decay_samples) + 1.0)
+        elif i < sustain_end:
+            envelope = f32(sustain)
+        else:
+            envelope = f32((i - sustain_end) * ((0.0 - sustain) / release_samples) + sustain)
+
+        sample = max(f32(-1.0), min(f32(1.0), sample * envelope))
+        out[i] = int(sample * f32(32767))
+
+    return out
+
+
+if njit is not None:
+    # Explicit signature compiles (or loads from the on-disk cache) at import
+    # rather than on the first call. No fastmath: reassociating or contracting
+    # the float32 ops would make the output drift from the NumPy path
+    _synth = njit('int16[::1](float64, float64, float64, float32, int64, int64, float64, int64, int16[::1])',
+                  cache=True)(_synth)
+
+
+def _quantize(samples):
+    """Clamp float samples to [-1, 1] and convert to 16-bit integers."""
+    samples = np.clip(samples, -1.0, 1.0)
+    samples *= 32767
+    return samples.astype('<i2')
+
+
+def _finish(samples, attack, decay, sustain, release, out):
+    """Apply the envelope and clamp samples in place, then write them to out."""
+    apply_envelope(samples, attack, decay, sustain, release)
+    np.clip(samples, -1.0, 1.0, out=samples)
+    samples *= 32767
+    out[:] = samples
+    return out
+
+
+def _output(num_samples, out):
+    """Return out sliced to num_samples, or a new 16-bit buffer if out is None."""
+    if out is None:
+        return np.empty(num_samples, dtype=np.int16)
+    if out.dtype != np.int16 or not out.flags.c_contiguous:
+        raise ValueError("Output buffer must be a contiguous int16 array")
+    if len(out) < num_samples:
+        raise ValueError(f"Output buffer holds {len(out)} samples, need {num_samples}")
+    return out[:num_samples]
+
+
+def _float_scratch(num_samples):
+    """Return the shared float scratch sliced to num_samples, or a new buffer if it's too short."""
+    if num_samples > len(_SCRATCH_F32):
+        return np.empty(num_samples, dtype=np.float32)
+    return _SCRATCH_F32[:num_samples]
+
+
+def render_tone(start_freq, end_freq, duration, amplitude=AMPLITUDE,
+                attack=0.01, decay=0.05, sustain=0.8, release=0.1, out=None):
+    """Render an enveloped tone or sweep as 16-bit samples; writes into out if given."""
+    num_samples = int(SAMPLE_RATE * duration)
+    out = _output(num_samples, out)
+    if njit is not None:
+        attack_samples, decay_samples, release_samples = _adsr_samples(attack, decay, release)
+        return _synth(start_freq, end_freq, duration, amplitude,
+                      attack_samples, decay_samples, sustain, release_samples, out)
+
+    samples = _float_scratch(num_samples)
+    if start_freq == end_freq:
+        generate_sine_wave(start_freq, duration, amplitude, out=samples)
+    else:
+        generate_frequency_sweep(start_freq, end_freq, duration, amplitude, out=samples)
+    return _finish(samples, attack, decay, sustain, release, out)
+
+
+def render_chord(frequencies, duration, amplitude=AMPLITUDE,
+                 attack=0.01, decay=0.05, sustain=0.8, release=0.1, out=None):
+    """Render an enveloped chord as 16-bit samples; writes into out if given."""
+    num_samples = int(SAMPLE_RATE * duration)
+    out = _output(num_samples, out)
+    samples = _float_scratch(num_samples)
+    generate_chord(frequencies, duration, amplitude, out=samples)
+    return _finish(samples, attack, decay, sustain, release, out)
+
+
 def save_wav(filename, samples):
-    """Save samples as 16-bit mono WAV file."""
+    """Save samples (float or 16-bit) as 16-bit mono WAV file."""
+    samples = np.asarray(samples)
+    if samples.dtype != np.int16:
+        samples = _quantize(samples)
+
     with wave.open(filename, 'w') as wav_file:
         wav_file.setnchannels(1)  # Mono
         wav_file.setsampwidth(2)  # 16-bit
         wav_file.setframerate(SAMPLE_RATE)
-
-        # Convert float samples to 16-bit integers
-        for sample in samples:
-            # Clamp to [-1, 1]
-            sample = max(-1.0, min(1.0, sample))
-            # Convert to 16-bit integer
-            int_sample = int(sample * 32767)
-            wav_file.writeframes(struct.pack('<h', int_sample))
+        wav_file.writeframes(samples.tobytes())
 
     print(f"Created: {filename}")
 
 
-def main():
-    # Get output directory
-    script_dir = Path(__file__).parent
-    output_dir = script_dir.parent / "assets" / "sounds"
-    output_dir.mkdir(parents=True, exist_ok=True)
+@dataclass(frozen=True)
+class Note:
+    """One render_tone/render_chord call: positional args, duration and options."""
+    render: Callable
+    duration: float
+    args: tuple = ()
+    options: dict = field(default_factory=dict)
 
-    print(f"Generating sounds in: {output_dir}")
-    print()
+    @property
+    def num_samples(self):
+        """Length of the note, in samples."""
+        return int(SAMPLE_RATE * self.duration)
 
-    # Enable sound - rising tone (440Hz to 880Hz, 200ms)
-    samples = generate_frequency_sweep(440, 880, 0.2)
-    samples = apply_envelope(samples, attack=0.01, decay=0.02, sustain=0.7, release=0.05)
-    save_wav(str(output_dir / "enable.wav"), samples)
+    def __call__(self, out=None):
+        return self.render(*self.args, duration=self.duration, out=out, **self.options)
 
-    # Disable sound - falling tone (880Hz to 440Hz, 200ms)
-    samples = generate_frequency_sweep(880, 440, 0.2)
-    samples = apply_envelope(samples, attack=0.01, decay=0.02, sustain=0.7, release=0.05)
-    save_wav(str(output_dir / "disable.wav"), samples)
 
-    # Zoom in - quick rising (600Hz to 900Hz, 150ms)
-    samples = generate_frequency_sweep(600, 900, 0.15)
-    samples = apply_envelope(samples, attack=0.005, decay=0.01, sustain=0.8, release=0.03)
-    save_wav(str(output_dir / "zoom_in.wav"), samples)
+@dataclass(frozen=True)
+class SoundSpec:
+    """A sound file to generate; its notes are rendered and played back to back."""
+    filename: str
+    notes: tuple
 
-    # Zoom out - quick falling (900Hz to 600Hz, 150ms)
-    samples = generate_frequency_sweep(900, 600, 0.15)
-    samples = apply_envelope(samples, attack=0.005, decay=0.01, sustain=0.8, release=0.03)
-    save_wav(str(output_dir / "zoom_out.wav"), samples)
+    @property
+    def num_samples(self):
+        """Total length of the sound, in samples."""
+        return sum(note.num_samples for note in self.notes)
 
-    # Profile switch - pleasant chord (C-E-G major chord, 300ms)
-    samples = generate_chord([523.25, 659.25, 783.99], 0.3)  # C5, E5, G5
-    samples = apply_envelope(samples, attack=0.02, decay=0.05, sustain=0.6, release=0.1)
-    save_wav(str(output_dir / "profile.wav"), samples)
 
+SOUNDS = [
+    # Enable sound - rising tone (440Hz to 880Hz, 200ms)
+    SoundSpec("enable.wav", (
+        Note(render_tone, 0.2, (440, 880), dict(attack=0.01, decay=0.02, sustain=0.7, release=0.05)),
+    )),
+    # Disable sound - falling tone (880Hz to 440Hz, 200ms)
+    SoundSpec("disable.wav", (
+        Note(render_tone, 0.2, (880, 440), dict(attack=0.01, decay=0.02, sustain=0.7, release=0.05)),
+    )),
+    # Zoom in - quick rising (600Hz to 900Hz, 150ms)
+    SoundSpec("zoom_in.wav", (
+        Note(render_tone, 0.15, (600, 900), dict(attack=0.005, decay=0.01, sustain=0.8, release=0.03)),
+    )),
+    # Zoom out - quick falling (900Hz to 600Hz, 150ms)
+    SoundSpec("zoom_out.wav", (
+        Note(render_tone, 0.15, (900, 600), dict(attack=0.005, decay=0.01, sustain=0.8, release=0.03)),
+    )),
+    # Profile switch - pleasant chord (C-E-G major chord, 300ms)
+    SoundSpec("profile.wav", (
+        Note(render_chord, 0.3, ((523.25, 659.25, 783.99),),  # C5, E5, G5
+             dict(attack=0.02, decay=0.05, sustain=0.6, release=0.1)),
+    )),
     # Speak start - soft blip (500Hz, 100ms)
-    samples = generate_sine_wave(500, 0.1, 0.4)
-    samples = apply_envelope(samples, attack=0.005, decay=0.01, sustain=0.8, release=0.02)
-    save_wav(str(output_dir / "speak_start.wav"), samples)
-
+    SoundSpec("speak_start.wav", (
+        Note(render_tone, 0.1, (500, 500), dict(amplitude=0.4, attack=0.005, decay=0.01, sustain=0.8, release=0.02)),
+    )),
     # Speak stop - lower blip (400Hz, 100ms)
-    samples = generate_sine_wave(400, 0.1, 0.4)
-    samples = apply_envelope(samples, attack=0.005, decay=0.01, sustain=0.8, release=0.02)
-    save_wav(str(output_dir / "speak_stop.wav"), samples)
-
+    SoundSpec("speak_stop.wav", (
+        Note(render_tone, 0.1, (400, 400), dict(amplitude=0.4, attack=0.005, decay=0.01, sustain=0.8, release=0.02)),
+    )),
     # Panic/emergency - descending three-note (800-600-400Hz, 500ms total)
-    samples1 = generate_sine_wave(800, 0.15, 0.6)
-    samples1 = apply_envelope(samples1, attack=0.01, decay=0.01, sustain=0.9, release=0.01)
-    samples2 = generate_sine_wave(600, 0.15, 0.6)
-    samples2 = apply_envelope(samples2, attack=0.01, decay=0.01, sustain=0.9, release=0.01)
-    samples3 = generate_sine_wave(400, 0.2, 0.6)
-    samples3 = apply_envelope(samples3, attack=0.01, decay=0.01, sustain=0.7, release=0.05)
-    samples = samples1 + samples2 + samples3
-    save_wav(str(output_dir / "panic.wav"), samples)
-
+    SoundSpec("panic.wav", (
+        Note(render_tone, 0.15, (800, 800), dict(amplitude=0.6, attack=0.01, decay=0.01, sustain=0.9, release=0.01)),
+        Note(render_tone, 0.15, (600, 600), dict(amplitude=0.6, attack=0.01, decay=0.01, sustain=0.9, release=0.01)),
+        Note(render_tone, 0.2, (400, 400), dict(amplitude=0.6, attack=0.01, decay=0.01, sustain=0.7, release=0.05)),
+    )),
     # Error - low buzz (200Hz, 200ms)
-    samples = generate_sine_wave(200, 0.2, 0.5)
-    samples = apply_envelope(samples, attack=0.01, decay=0.02, sustain=0.8, release=0.03)
-    save_wav(str(output_dir / "error.wav"), samples)
-
+    SoundSpec("error.wav", (
+        Note(render_tone, 0.2, (200, 200), dict(amplitude=0.5, attack=0.01, decay=0.02, sustain=0.8, release=0.03)),
+    )),
     # Click - short high blip (1000Hz, 50ms)
-    samples = generate_sine_wave(1000, 0.05, 0.3)
-    samples = apply_envelope(samples, attack=0.002, decay=0.005, sustain=0.8, release=0.01)
-    save_wav(str(output_dir / "click.wav"), samples)
-
+    SoundSpec("click.wav", (
+        Note(render_tone, 0.05, (1000, 1000), dict(amplitude=0.3, attack=0.002, decay=0.005, sustain=0.8, release=0.01)),
+    )),
     # Focus - very soft tone (700Hz, 80ms)
-    samples = generate_sine_wave(700, 0.08, 0.25)
-    samples = apply_envelope(samples, attack=0.005, decay=0.01, sustain=0.7, release=0.02)
-    save_wav(str(output_dir / "focus.wav"), samples)
+    SoundSpec("focus.wav", (
+        Note(render_tone, 0.08, (700, 700), dict(amplitude=0.25, attack=0.005, decay=0.01, sustain=0.7, release=0.02)),
+    )),
+]
+
+
+# Reusable buffers sized for the longest sound, sliced per render so
+# generating a sound doesn't allocate per stage
+MAX_SAMPLES = max(spec.num_samples for spec in SOUNDS)
+_SCRATCH_F32 = np.empty(MAX_SAMPLES, dtype=np.float32)
+_SCRATCH_I16 = np.empty(MAX_SAMPLES, dtype=np.int16)
+
+
+def _render(spec, output_dir):
+    """Render one sound and write it to output_dir."""
+    # Notes are rendered back to back into the shared 16-bit buffer
+    buffer = _SCRATCH_I16
+    if spec.num_samples > len(buffer):
+        buffer = np.empty(spec.num_samples, dtype=np.int16)
+    end = 0
+    for note in spec.notes:
+        end += len(note(out=buffer[end:]))
+    save_wav(str(output_dir / spec.filename), buffer[:end])
+
+
+def warm():
+    """Compile the Numba kernel into its on-disk cache, then exit."""
+    if njit is None:
+        print("Numba is not installed; nothing to warm up.")
+        return
+
+    _synth(440.0, 440.0, 1 / SAMPLE_RATE, AMPLITUDE, 0, 0, 1.0, 0, np.empty(1, dtype=np.int16))
+    print("Numba kernel compiled and cached.")
+
+
+def main():
+    if "--warm" in sys.argv[1:]:
+        warm()
+        return
+
+    # Get output directory
+    script_dir = Path(__file__).parent
+    output_dir = script_dir.parent / "assets" / "sounds"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print(f"Generating sounds in: {output_dir}")
+    print()
+
+    for spec in SOUNDS:
+        _render(spec, output_dir)
 
     print()
     print("All sounds generated successfully!")